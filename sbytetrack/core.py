@@ -1,12 +1,18 @@
-from typing import List, Tuple, Dict
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Dict
 
 import numpy as np
 
-from sbytetrack.utils import box_iou_batch
+from sbytetrack.utils import box_iou, box_iou_batch
 from sbytetrack import matching
 from sbytetrack.kalman_filter import KalmanFilter
 from sbytetrack.single_object_track import STrack, TrackState
-from sbytetrack.utils import IdCounter
+from sbytetrack.utils import IdCounter, use_serial_kernels
+
+# Threads only pay off once enough classes have detections in a frame.
+PARALLEL_MIN_CLASSES = 4
 
 
 class BYTETrack:
@@ -18,6 +24,8 @@ class BYTETrack:
         minimum_matching_threshold: float = 0.8,
         frame_rate: int = 30,
         minimum_consecutive_frames: int = 1,
+        independent_classes: bool = False,
+        parallel: bool = False,
     ):    
         """
         Initialize the ByteTrack objectt
@@ -40,7 +48,22 @@ class BYTETrack:
                 be tracked before it is considered a 'valid' track.
                 Increasing minimum_consecutive_frames prevents the creation of accidental tracks from
                 false detection or double detection, but risks missing shorter tracks.
+            independent_classes (bool): Give every class its own lost and removed tracks.
+                By default lost tracks are pooled across classes, so a lost track may be
+                re-matched by a detection of another class. With independent_classes each
+                class is tracked in isolation, which changes the association results.
+            parallel (bool): Update classes concurrently in a thread pool when at least
+                `PARALLEL_MIN_CLASSES` classes have detections in a frame. Requires
+                independent_classes, since classes sharing lost tracks cannot be updated
+                concurrently. Associations are the same as without parallel, but the order
+                in which new track IDs are handed out across classes is not deterministic.
+
+        Raises:
+            ValueError: If parallel is set without independent_classes.
         """  # noqa: E501 // docs
+        if parallel and not independent_classes:
+            raise ValueError("parallel=True requires independent_classes=True")
+
         self.track_activation_threshold = track_activation_threshold
         self.minimum_matching_threshold = minimum_matching_threshold
 
@@ -61,8 +84,66 @@ class BYTETrack:
         self.external_id_counter = IdCounter(start_id=1)
         self.n_classes = n_classes
         self.cls2tracked_tracks = {i: [] for i in range(n_classes)}
+        # Scratch cost matrix reused across frames, see `_cost_buffer`.
+        self._cost_buf = np.empty((0, 0), dtype=np.float32)
+        self.independent_classes = independent_classes
+        self.parallel = parallel
+        # Per-class tracker state used with `independent_classes`, see `_cls_worker`.
+        self._cls2worker: Dict[int, BYTETrack] = {}
+        # Thread pool kept across frames when `parallel` is set, see `_get_executor`.
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __getstate__(self) -> dict:
+        # The thread pool can be neither pickled nor shared with copies.
+        state = self.__dict__.copy()
+        state["_executor"] = None
+        return state
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+            Return the thread pool used by `parallel`, creating it on first use.
+            Its threads switch numba to the serial, GIL-releasing IoU kernel.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                initializer=use_serial_kernels,
+            )
+        return self._executor
 
 
+    def _cost_buffer(self, n: int, m: int) -> np.ndarray:
+        """
+            Return an (n, m) view into the scratch cost matrix, growing it by
+            doubling when needed. The view is overwritten by the next call.
+        """
+        cap_n, cap_m = self._cost_buf.shape
+        if n > cap_n or m > cap_m:
+            self._cost_buf = np.empty(
+                (max(n, 2 * cap_n), max(m, 2 * cap_m)), dtype=np.float32
+            )
+        return self._cost_buf[:n, :m]
+
+    def _cls_worker(self, cls_id: int) -> "BYTETrack":
+        """
+            Return the tracker holding the state of `cls_id` with
+            `independent_classes`, creating it on first use. Workers share
+            the settings, Kalman filters and ID counters of this tracker but
+            own their track lists and scratch buffer, so classes can be
+            updated from different threads.
+        """
+        worker = self._cls2worker.get(cls_id)
+        if worker is None:
+            worker = copy.copy(self)
+            worker.tracked_tracks = []
+            worker.lost_tracks = []
+            worker.removed_tracks = []
+            worker.cls2tracked_tracks = {}
+            worker._cost_buf = np.empty((0, 0), dtype=np.float32)
+            worker._cls2worker = {}
+            self._cls2worker[cls_id] = worker
+        return worker
+
     def _cls_group(
             self, xyxy_array: np.array, conf_array: np.array, 
             cls_array: np.array,) -> Dict[int, Tuple]:
@@ -76,18 +157,53 @@ class BYTETrack:
                 cls_array (np.array): Array of class IDs with shape (N,).
 
             Returns:
-                Dict[int, Tuple]: A dictionary where each key is a class ID (int) and 
-                each value is a tuple containing:
-                    - A list of bounding boxes (List[np.array]) corresponding to that class.
-                    - A list of confidence scores (List[float]) corresponding to that class.
-                    - A list of original detection orders (List[int]).
+                Dict[int, Tuple]: A dictionary where each key is a class ID (int) with
+                at least one detection, in ascending order, and each value is a tuple containing:
+                    - An array of bounding boxes (np.ndarray) corresponding to that class.
+                    - An array of confidence scores (np.ndarray) corresponding to that class.
+                    - An array of original detection indices (np.ndarray of np.intp).
+
+            Raises:
+                ValueError: If a class ID is not an integer or is outside
+                    `[0, n_classes)`.
         """
-        # cls2boxes[cls_i] = (cls_xyxy_array, cls_conf_array, box_order_list)
-        cls2boxes = {cls_id: ([], [], []) for cls_id in range(self.n_classes)}
-        for order, (xyxy, conf, cls_id) in enumerate(zip(xyxy_array, conf_array, cls_array)):
-            cls2boxes[cls_id][0].append(xyxy)
-            cls2boxes[cls_id][1].append(conf)
-            cls2boxes[cls_id][2].append(order)
+        xyxy_array = np.asarray(xyxy_array).reshape(-1, 4)
+        conf_array = np.asarray(conf_array).reshape(-1)
+        cls_array = np.asarray(cls_array).reshape(-1)
+        if cls_array.dtype.kind == "f":
+            # NaN compares unequal to itself, so it is rejected here too.
+            non_integral = cls_array != np.floor(cls_array)
+            if non_integral.any():
+                raise ValueError(
+                    "class IDs must be integers, "
+                    f"got {cls_array[non_integral][0]}"
+                )
+
+        # Sort detections by class once, then slice each class's contiguous range.
+        order = np.argsort(cls_array, kind="stable").astype(np.intp, copy=False)
+        sorted_cls = cls_array[order]
+        if len(sorted_cls) > 0 and (
+            sorted_cls[0] < 0 or sorted_cls[-1] >= self.n_classes
+        ):
+            raise ValueError(
+                f"class IDs must be in [0, {self.n_classes}), "
+                f"got values in [{sorted_cls[0]}, {sorted_cls[-1]}]"
+            )
+        cls_ids = np.arange(self.n_classes)
+        starts = np.searchsorted(sorted_cls, cls_ids, side="left")
+        ends = np.searchsorted(sorted_cls, cls_ids, side="right")
+
+        # cls2boxes[cls_i] = (cls_xyxy_array, cls_conf_array, box_order_array)
+        cls2boxes = {}
+        for cls_id, start, end in zip(range(self.n_classes), starts, ends):
+            if start == end:
+                continue
+            cls_order = order[start:end]
+            cls2boxes[cls_id] = (
+                xyxy_array[cls_order],
+                conf_array[cls_order],
+                cls_order,
+            )
 
         return cls2boxes
 
@@ -106,35 +222,72 @@ class BYTETrack:
             cls_array (np.ndarray): Array of class IDs corresponding to the bounding boxes.
 
         Returns:
-            np.ndarray: Array of track IDs sorted by the original order of detections.
+            np.ndarray: Array of track IDs in the original order of detections,
+                with -1 for detections that are not assigned to a track.
         """
         # Group detections by class into a dictionary: {class_id -> (boxes, confidences, original order)}.
         cls2boxes = self._cls_group(xyxy_array, conf_array, cls_array)
 
-        track_id_array = np.array([], dtype=int)
-        orig_order: List[int] = []
+        track_id_array = np.full(len(cls_array), -1, dtype=int)
         current_frame_id = self.frame_id
 
-        for cls_id in range(self.n_classes):
-            cls_xyxy_array, cls_conf_array, cls_box_order_list = cls2boxes[cls_id]
-            
-            if len(cls_xyxy_array) < 1:
-                continue
-
-            orig_order += cls_box_order_list
+        if self.independent_classes:
+            self._independent_update(cls2boxes, track_id_array)
+            self.frame_id = current_frame_id + 1
+            return track_id_array
 
+        for cls_id, (cls_xyxy_array, cls_conf_array, cls_box_order_array) in cls2boxes.items():
             # Update and retrieve tracks for the current class.
             self.tracked_tracks = self.cls2tracked_tracks[cls_id]
             self.frame_id = current_frame_id
             cls_track_id_array = self.single_cls_update(cls_xyxy_array, cls_conf_array)
 
             self.cls2tracked_tracks[cls_id] = self.tracked_tracks
-            track_id_array = np.concatenate((track_id_array, cls_track_id_array))
+            # Scatter the class track IDs back to the original detection order.
+            track_id_array[cls_box_order_array] = cls_track_id_array
 
         self.frame_id = current_frame_id + 1
-        # sort the track IDs to match the original detection order.
 
-        return track_id_array[np.argsort(orig_order)]
+        return track_id_array
+
+    def _independent_update(
+        self, cls2boxes: Dict[int, Tuple], track_id_array: np.ndarray
+    ) -> None:
+        """
+        Updates every class with detections through its own worker tracker,
+        using the thread pool when `parallel` is set and enough classes are present.
+
+        Args:
+            cls2boxes (Dict[int, Tuple]): Grouped detections from `_cls_group`.
+            track_id_array (np.ndarray): Output array the class track IDs are
+                scattered into, in the original order of detections.
+        """
+        workers = []
+        for cls_id in cls2boxes:
+            worker = self._cls_worker(cls_id)
+            worker.frame_id = self.frame_id
+            workers.append(worker)
+
+        def run(worker: BYTETrack, boxes: Tuple) -> np.ndarray:
+            cls_xyxy_array, cls_conf_array, _ = boxes
+            return worker.single_cls_update(cls_xyxy_array, cls_conf_array)
+
+        # Threads only add overhead on a single CPU.
+        if (
+            self.parallel
+            and len(workers) >= PARALLEL_MIN_CLASSES
+            and (os.cpu_count() or 1) > 1
+        ):
+            executor = self._get_executor()
+            results = list(executor.map(run, workers, cls2boxes.values()))
+        else:
+            results = [run(w, b) for w, b in zip(workers, cls2boxes.values())]
+
+        for (cls_id, boxes), worker, cls_track_id_array in zip(
+            cls2boxes.items(), workers, results
+        ):
+            self.cls2tracked_tracks[cls_id] = worker.tracked_tracks
+            track_id_array[boxes[2]] = cls_track_id_array
 
     def single_cls_update(
         self,
@@ -154,25 +307,33 @@ class BYTETrack:
         if len(xyxy_array) * len(conf_array) == 0:
             return np.array([], dtype=int)
 
-        cp_xyxy = np.array(xyxy_array).copy()
-        cp_conf = np.array(conf_array).copy().reshape(-1, 1)
-        tensors = np.hstack((cp_xyxy, cp_conf))
-        tracks = self.update_with_tensors(tensors=tensors)
+        xyxy_array = np.asarray(xyxy_array)
+        conf_array = np.asarray(conf_array)
+        bboxes = np.ascontiguousarray(xyxy_array, dtype=np.float32).reshape(-1, 4)
+        # Threshold scores in the dtype boxes and scores promote to, as the
+        # packed (N, 5) tensor did, so float32 scores stay float32.
+        scores = conf_array.astype(
+            np.result_type(xyxy_array, conf_array), copy=False
+        ).reshape(-1)
+        tracks = self.update_with_tensors(bboxes=bboxes, scores=scores)
 
         if len(tracks) > 0:
-            detection_bounding_boxes = np.asarray([det[:4] for det in tensors])
-            track_bounding_boxes = np.asarray([track.tlbr for track in tracks])
-            ious = box_iou_batch(detection_bounding_boxes, track_bounding_boxes)
-            iou_costs = 1 - ious
+            track_bounding_boxes = STrack.stack_tlbr(tracks)
+            ious = box_iou_batch(
+                bboxes,
+                track_bounding_boxes,
+                out=self._cost_buffer(len(bboxes), len(track_bounding_boxes)),
+            )
+            iou_costs = np.subtract(1, ious, out=ious)
             matches, _, _ = matching.linear_assignment(iou_costs, 0.5)
-            track_id_array = np.full(len(cp_conf), -1, dtype=int)
+            track_id_array = np.full(len(scores), -1, dtype=int)
 
             for i_detection, i_track in matches:
                 track_id_array[i_detection] = int(tracks[i_track].external_track_id)
 
             return track_id_array
         else:
-            return np.full(len(cp_conf), -1, dtype=int)
+            return np.full(len(scores), -1, dtype=int)
 
 
     def reset(self) -> None:
@@ -190,13 +351,29 @@ class BYTETrack:
         self.tracked_tracks = []
         self.lost_tracks = []
         self.removed_tracks = []
+        self._cls2worker = {}
+        self.close()
 
-    def update_with_tensors(self, tensors: np.ndarray) -> List[STrack]:
+    def close(self) -> None:
+        """
+        Shuts down the thread pool used by `parallel`, waiting for running
+        updates to finish. The tracker stays usable and starts a new pool on
+        the next parallel update.
         """
-        Updates the tracker with the provided tensors and returns the updated tracks.
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def update_with_tensors(
+        self, bboxes: np.ndarray, scores: np.ndarray
+    ) -> List[STrack]:
+        """
+        Updates the tracker with the provided detections and returns the updated tracks.
 
         Parameters:
-            tensors: The new tensors to update with.
+            bboxes: Array of shape (N, 4) with boxes in the format
+                [x_min, y_min, x_max, y_max].
+            scores: Array of shape (N,) with the confidence of each box.
 
         Returns:
             List[STrack]: Updated tracks.
@@ -207,9 +384,6 @@ class BYTETrack:
         lost_stracks = []
         removed_stracks = []
 
-        scores = tensors[:, 4]
-        bboxes = tensors[:, :4]
-
         remain_inds = scores > self.track_activation_threshold
         inds_low = scores > 0.1
         inds_high = scores < self.track_activation_threshold
@@ -222,17 +396,16 @@ class BYTETrack:
 
         if len(dets) > 0:
             """Detections"""
-            detections = [
-                STrack(
-                    STrack.tlbr_to_tlwh(tlbr),
-                    score_keep,
-                    self.minimum_consecutive_frames,
-                    self.shared_kalman,
-                    self.internal_id_counter,
-                    self.external_id_counter,
-                )
-                for (tlbr, score_keep) in zip(dets, scores_keep)
-            ]
+            tlwh_keep = dets.copy()
+            tlwh_keep[:, 2:] -= tlwh_keep[:, :2]
+            detections = STrack.create_batch(
+                tlwh_keep,
+                scores_keep,
+                self.minimum_consecutive_frames,
+                self.shared_kalman,
+                self.internal_id_counter,
+                self.external_id_counter,
+            )
         else:
             detections = []
 
@@ -250,38 +423,45 @@ class BYTETrack:
         strack_pool = joint_tracks(tracked_stracks, self.lost_tracks)
         # Predict the current location with KF
         STrack.multi_predict(strack_pool, self.shared_kalman)
-        dists = matching.iou_distance(strack_pool, detections)
-
-        dists = matching.fuse_score(dists, detections)
-        matches, u_track, u_detection = matching.linear_assignment(
-            dists, thresh=self.minimum_matching_threshold
+        if strack_pool and detections:
+            dists = matching.iou_distance(
+                strack_pool,
+                detections,
+                out=self._cost_buffer(len(strack_pool), len(detections)),
+            )
+
+            dists = matching.fuse_score(dists, detections)
+            matches, u_track, u_detection = matching.linear_assignment(
+                dists, thresh=self.minimum_matching_threshold
+            )
+        else:
+            matches, u_track, u_detection = matching.empty_assignment(
+                len(strack_pool), len(detections)
+            )
+
+        updated, re_activated = STrack.multi_update(
+            [strack_pool[itracked] for itracked, _ in matches],
+            [detections[idet] for _, idet in matches],
+            self.frame_id,
+            self.shared_kalman,
         )
-
-        for itracked, idet in matches:
-            track = strack_pool[itracked]
-            det = detections[idet]
-            if track.state == TrackState.Tracked:
-                track.update(detections[idet], self.frame_id)
-                activated_starcks.append(track)
-            else:
-                track.re_activate(det, self.frame_id)
-                refind_stracks.append(track)
+        activated_starcks.extend(updated)
+        refind_stracks.extend(re_activated)
 
         """ Step 3: Second association, with low score detection boxes"""
         # association the untrack to the low score detections
         if len(dets_second) > 0:
             """Detections"""
-            detections_second = [
-                STrack(
-                    STrack.tlbr_to_tlwh(tlbr),
-                    score_second,
-                    self.minimum_consecutive_frames,
-                    self.shared_kalman,
-                    self.internal_id_counter,
-                    self.external_id_counter,
-                )
-                for (tlbr, score_second) in zip(dets_second, scores_second)
-            ]
+            tlwh_second = dets_second.copy()
+            tlwh_second[:, 2:] -= tlwh_second[:, :2]
+            detections_second = STrack.create_batch(
+                tlwh_second,
+                scores_second,
+                self.minimum_consecutive_frames,
+                self.shared_kalman,
+                self.internal_id_counter,
+                self.external_id_counter,
+            )
         else:
             detections_second = []
         r_tracked_stracks = [
@@ -289,19 +469,27 @@ class BYTETrack:
             for i in u_track
             if strack_pool[i].state == TrackState.Tracked
         ]
-        dists = matching.iou_distance(r_tracked_stracks, detections_second)
-        matches, u_track, u_detection_second = matching.linear_assignment(
-            dists, thresh=0.5
+        if r_tracked_stracks and detections_second:
+            dists = matching.iou_distance(
+                r_tracked_stracks,
+                detections_second,
+                out=self._cost_buffer(len(r_tracked_stracks), len(detections_second)),
+            )
+            matches, u_track, u_detection_second = matching.linear_assignment(
+                dists, thresh=0.5
+            )
+        else:
+            matches, u_track, u_detection_second = matching.empty_assignment(
+                len(r_tracked_stracks), len(detections_second)
+            )
+        updated, re_activated = STrack.multi_update(
+            [r_tracked_stracks[itracked] for itracked, _ in matches],
+            [detections_second[idet] for _, idet in matches],
+            self.frame_id,
+            self.shared_kalman,
         )
-        for itracked, idet in matches:
-            track = r_tracked_stracks[itracked]
-            det = detections_second[idet]
-            if track.state == TrackState.Tracked:
-                track.update(det, self.frame_id)
-                activated_starcks.append(track)
-            else:
-                track.re_activate(det, self.frame_id)
-                refind_stracks.append(track)
+        activated_starcks.extend(updated)
+        refind_stracks.extend(re_activated)
 
         for it in u_track:
             track = r_tracked_stracks[it]
@@ -311,15 +499,29 @@ class BYTETrack:
 
         """Deal with unconfirmed tracks, usually tracks with only one beginning frame"""
         detections = [detections[i] for i in u_detection]
-        dists = matching.iou_distance(unconfirmed, detections)
-
-        dists = matching.fuse_score(dists, detections)
-        matches, u_unconfirmed, u_detection = matching.linear_assignment(
-            dists, thresh=0.7
+        if unconfirmed and detections:
+            dists = matching.iou_distance(
+                unconfirmed,
+                detections,
+                out=self._cost_buffer(len(unconfirmed), len(detections)),
+            )
+
+            dists = matching.fuse_score(dists, detections)
+            matches, u_unconfirmed, u_detection = matching.linear_assignment(
+                dists, thresh=0.7
+            )
+        else:
+            matches, u_unconfirmed, u_detection = matching.empty_assignment(
+                len(unconfirmed), len(detections)
+            )
+        # Unconfirmed tracks are always in the Tracked state, so all are updated.
+        updated, _ = STrack.multi_update(
+            [unconfirmed[itracked] for itracked, _ in matches],
+            [detections[idet] for _, idet in matches],
+            self.frame_id,
+            self.shared_kalman,
         )
-        for itracked, idet in matches:
-            unconfirmed[itracked].update(detections[idet], self.frame_id)
-            activated_starcks.append(unconfirmed[itracked])
+        activated_starcks.extend(updated)
         for it in u_unconfirmed:
             track = unconfirmed[it]
             track.state = TrackState.Removed
@@ -370,18 +572,24 @@ def joint_tracks(
         Combined list of tracks from track_list_a and track_list_b
             without duplicate internal_track_id values.
     """
+    if not track_list_b:
+        return list(track_list_a)
+    if not track_list_a:
+        return list(track_list_b)
+
     seen_track_ids = set()
     result = []
 
-    for track in track_list_a + track_list_b:
-        if track.internal_track_id not in seen_track_ids:
-            seen_track_ids.add(track.internal_track_id)
-            result.append(track)
+    for track_list in (track_list_a, track_list_b):
+        for track in track_list:
+            if track.internal_track_id not in seen_track_ids:
+                seen_track_ids.add(track.internal_track_id)
+                result.append(track)
 
     return result
 
 
-def sub_tracks(track_list_a: List[STrack], track_list_b: List[STrack]) -> List[int]:
+def sub_tracks(track_list_a: List[STrack], track_list_b: List[STrack]) -> List[STrack]:
     """
     Returns a list of tracks from track_list_a after removing any tracks
     that share the same internal_track_id with tracks in track_list_b.
@@ -393,23 +601,37 @@ def sub_tracks(track_list_a: List[STrack], track_list_b: List[STrack]) -> List[i
     Returns:
         List of remaining tracks from track_list_a after subtraction.
     """
-    tracks = {track.internal_track_id: track for track in track_list_a}
-    track_ids_b = {track.internal_track_id for track in track_list_b}
+    if not track_list_a or not track_list_b:
+        return list(track_list_a)
 
-    for track_id in track_ids_b:
-        tracks.pop(track_id, None)
+    track_ids_b = {track.internal_track_id for track in track_list_b}
 
-    return list(tracks.values())
+    return [
+        track for track in track_list_a if track.internal_track_id not in track_ids_b
+    ]
 
 
 def remove_duplicate_tracks(
     tracks_a: List[STrack], tracks_b: List[STrack]
 ) -> Tuple[List[STrack], List[STrack]]:
-    pairwise_distance = matching.iou_distance(tracks_a, tracks_b)
-    matching_pairs = np.where(pairwise_distance < 0.15)
+    if not tracks_a or not tracks_b:
+        return tracks_a, tracks_b
+
+    if len(tracks_a) * len(tracks_b) < 64:
+        # Few pairs: a scalar scan is cheaper than building the IoU matrix.
+        boxes_b = [track.tlbr_cached() for track in tracks_b]
+        matching_pairs = [
+            (track_index_a, track_index_b)
+            for track_index_a, track_a in enumerate(tracks_a)
+            for track_index_b, box_b in enumerate(boxes_b)
+            if 1 - box_iou(track_a.tlbr_cached(), box_b) < 0.15
+        ]
+    else:
+        pairwise_distance = matching.iou_distance(tracks_a, tracks_b)
+        matching_pairs = zip(*np.where(pairwise_distance < 0.15))
 
     duplicates_a, duplicates_b = set(), set()
-    for track_index_a, track_index_b in zip(*matching_pairs):
+    for track_index_a, track_index_b in matching_pairs:
         time_a = tracks_a[track_index_a].frame_id - tracks_a[track_index_a].start_frame
         time_b = tracks_b[track_index_b].frame_id - tracks_b[track_index_b].start_frame
         if time_a > time_b:
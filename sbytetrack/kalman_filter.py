@@ -1,7 +1,108 @@
 from typing import Tuple
 
 import numpy as np
-import scipy.linalg
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional dependency
+    njit = None
+
+if njit is not None:
+
+    # The kernels below hardcode the constant velocity model of KalmanFilter,
+    # F = [[I, dt*I], [0, I]] and H = [I, 0], and work on the blocks of each
+    # 8x8 covariance directly instead of calling BLAS on tiny matrices.
+
+    @njit(cache=True, nogil=True)
+    def _multi_predict_kernel(
+        mean, covariance, dt, std_weight_position, std_weight_velocity
+    ):
+        n, d = mean.shape
+        ndim = d // 2
+        new_mean = mean.copy()
+        new_covariance = covariance.copy()
+        for k in range(n):
+            for i in range(ndim):
+                new_mean[k, i] += dt * mean[k, ndim + i]
+            # F P F^T, block by block: P11 + dt (P12 + P21) + dt^2 P22,
+            # P12 + dt P22 and P21 + dt P22, with P22 unchanged.
+            for i in range(ndim):
+                for j in range(ndim):
+                    p22 = covariance[k, ndim + i, ndim + j]
+                    p12 = covariance[k, i, ndim + j] + dt * p22
+                    p21 = covariance[k, ndim + i, j] + dt * p22
+                    new_covariance[k, i, ndim + j] = p12
+                    new_covariance[k, ndim + i, j] = p21
+                    new_covariance[k, i, j] += dt * (
+                        covariance[k, i, ndim + j] + p21
+                    )
+
+            std_pos = std_weight_position * mean[k, 3]
+            std_vel = std_weight_velocity * mean[k, 3]
+            new_covariance[k, 0, 0] += std_pos * std_pos
+            new_covariance[k, 1, 1] += std_pos * std_pos
+            new_covariance[k, 2, 2] += 1e-2 * 1e-2
+            new_covariance[k, 3, 3] += std_pos * std_pos
+            new_covariance[k, 4, 4] += std_vel * std_vel
+            new_covariance[k, 5, 5] += std_vel * std_vel
+            new_covariance[k, 6, 6] += 1e-5 * 1e-5
+            new_covariance[k, 7, 7] += std_vel * std_vel
+        return new_mean, new_covariance
+
+    @njit(cache=True, nogil=True)
+    def _multi_update_kernel(mean, covariance, measurement, std_weight_position):
+        n, d = mean.shape
+        ndim = measurement.shape[1]
+        new_mean = np.empty_like(mean)
+        new_covariance = np.empty_like(covariance)
+        chol = np.zeros((ndim, ndim))
+        gain_t = np.empty((ndim, d))
+        innovation = np.empty(ndim)
+        for k in range(n):
+            # Cholesky factor of the projected covariance S = H P H^T + R.
+            std_pos = std_weight_position * mean[k, 3]
+            for i in range(ndim):
+                for j in range(i + 1):
+                    acc = covariance[k, i, j]
+                    if i == j:
+                        acc += 1e-1 * 1e-1 if i == 2 else std_pos * std_pos
+                    for l in range(j):
+                        acc -= chol[i, l] * chol[j, l]
+                    if i == j:
+                        chol[i, i] = np.sqrt(acc)
+                    else:
+                        chol[i, j] = acc / chol[j, j]
+                innovation[i] = measurement[k, i] - mean[k, i]
+
+            # K^T = S^-1 (P H^T)^T, by forward then backward substitution.
+            for j in range(d):
+                for i in range(ndim):
+                    acc = covariance[k, j, i]
+                    for l in range(i):
+                        acc -= chol[i, l] * gain_t[l, j]
+                    gain_t[i, j] = acc / chol[i, i]
+                for i in range(ndim - 1, -1, -1):
+                    acc = gain_t[i, j]
+                    for l in range(i + 1, ndim):
+                        acc -= chol[l, i] * gain_t[l, j]
+                    gain_t[i, j] = acc / chol[i, i]
+
+            # x + K y and P - K S K^T, where K S K^T = (P H^T) K^T.
+            for i in range(d):
+                acc = mean[k, i]
+                for l in range(ndim):
+                    acc += gain_t[l, i] * innovation[l]
+                new_mean[k, i] = acc
+                for j in range(d):
+                    acc = covariance[k, i, j]
+                    for l in range(ndim):
+                        acc -= covariance[k, i, l] * gain_t[l, j]
+                    new_covariance[k, i, j] = acc
+        return new_mean, new_covariance
+
+else:
+    _multi_predict_kernel = None
+    _multi_update_kernel = None
 
 
 class KalmanFilter:
@@ -23,6 +124,7 @@ class KalmanFilter:
     def __init__(self):
         ndim, dt = 4, 1.0
 
+        self._dt = dt
         self._motion_mat = np.eye(2 * ndim, 2 * ndim)
         for i in range(ndim):
             self._motion_mat[i, ndim + i] = dt
@@ -77,27 +179,11 @@ class KalmanFilter:
                 covariance matrix of the predicted state.
                 Unobserved velocities are initialized to 0 mean.
         """
-        std_pos = [
-            self._std_weight_position * mean[3],
-            self._std_weight_position * mean[3],
-            1e-2,
-            self._std_weight_position * mean[3],
-        ]
-        std_vel = [
-            self._std_weight_velocity * mean[3],
-            self._std_weight_velocity * mean[3],
-            1e-5,
-            self._std_weight_velocity * mean[3],
-        ]
-        motion_cov = np.diag(np.square(np.r_[std_pos, std_vel]))
-
-        mean = np.dot(mean, self._motion_mat.T)
-        covariance = (
-            np.linalg.multi_dot((self._motion_mat, covariance, self._motion_mat.T))
-            + motion_cov
+        # Share the vectorized prediction so both paths stay in sync.
+        new_mean, new_covariance = self.multi_predict(
+            np.asarray(mean)[None], np.asarray(covariance)[None]
         )
-
-        return mean, covariance
+        return new_mean[0], new_covariance[0]
 
     def project(
         self, mean: np.ndarray, covariance: np.ndarray
@@ -144,6 +230,15 @@ class KalmanFilter:
                 covariance matrix of the predicted state.
                 Unobserved velocities are initialized to 0 mean.
         """
+        if _multi_predict_kernel is not None:
+            return _multi_predict_kernel(
+                np.ascontiguousarray(mean, dtype=np.float64),
+                np.ascontiguousarray(covariance, dtype=np.float64),
+                self._dt,
+                self._std_weight_position,
+                self._std_weight_velocity,
+            )
+
         std_pos = [
             self._std_weight_position * mean[:, 3],
             self._std_weight_position * mean[:, 3],
@@ -158,17 +253,66 @@ class KalmanFilter:
         ]
         sqr = np.square(np.r_[std_pos, std_vel]).T
 
-        motion_cov = []
-        for i in range(len(mean)):
-            motion_cov.append(np.diag(sqr[i]))
-        motion_cov = np.asarray(motion_cov)
-
         mean = np.dot(mean, self._motion_mat.T)
-        left = np.dot(self._motion_mat, covariance).transpose((1, 0, 2))
-        covariance = np.dot(left, self._motion_mat.T) + motion_cov
+        covariance = np.matmul(
+            np.matmul(self._motion_mat, covariance), self._motion_mat.T
+        )
+        # The motion noise is diagonal, so add it in place on every
+        # covariance's diagonal instead of building N diagonal matrices.
+        diag = np.arange(covariance.shape[-1])
+        covariance[:, diag, diag] += sqr
 
         return mean, covariance
 
+    def multi_update(
+        self, mean: np.ndarray, covariance: np.ndarray, measurement: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run Kalman filter correction step (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional predicted mean matrix.
+            covariance (ndarray): The Nx8x8 dimensional covariance matrices.
+            measurement (ndarray): The Nx4 dimensional measurement matrix
+                of (x, y, a, h) rows.
+
+        Returns:
+            Tuple[ndarray, ndarray]: Returns the measurement-corrected
+                state distributions.
+        """
+        if _multi_update_kernel is not None:
+            return _multi_update_kernel(
+                np.ascontiguousarray(mean, dtype=np.float64),
+                np.ascontiguousarray(covariance, dtype=np.float64),
+                np.ascontiguousarray(measurement, dtype=np.float64),
+                self._std_weight_position,
+            )
+
+        std = [
+            self._std_weight_position * mean[:, 3],
+            self._std_weight_position * mean[:, 3],
+            1e-1 * np.ones_like(mean[:, 3]),
+            self._std_weight_position * mean[:, 3],
+        ]
+        sqr = np.square(std).T
+
+        projected_mean = np.dot(mean, self._update_mat.T)
+        cov_h = np.matmul(covariance, self._update_mat.T)
+        projected_cov = np.matmul(self._update_mat, cov_h)
+        diag = np.arange(projected_cov.shape[-1])
+        projected_cov[:, diag, diag] += sqr
+
+        kalman_gain = np.linalg.solve(
+            projected_cov, cov_h.transpose((0, 2, 1))
+        ).transpose((0, 2, 1))
+        innovation = measurement - projected_mean
+
+        new_mean = mean + np.matmul(kalman_gain, innovation[:, :, None])[:, :, 0]
+        new_covariance = covariance - np.matmul(
+            np.matmul(kalman_gain, projected_cov), kalman_gain.transpose((0, 2, 1))
+        )
+        return new_mean, new_covariance
+
     def update(
         self, mean: np.ndarray, covariance: np.ndarray, measurement: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray]:
@@ -186,20 +330,9 @@ class KalmanFilter:
             Tuple[ndarray, ndarray]: Returns the measurement-corrected
                 state distribution.
         """
-        projected_mean, projected_cov = self.project(mean, covariance)
-
-        chol_factor, lower = scipy.linalg.cho_factor(
-            projected_cov, lower=True, check_finite=False
-        )
-        kalman_gain = scipy.linalg.cho_solve(
-            (chol_factor, lower),
-            np.dot(covariance, self._update_mat.T).T,
-            check_finite=False,
-        ).T
-        innovation = measurement - projected_mean
-
-        new_mean = mean + np.dot(innovation, kalman_gain.T)
-        new_covariance = covariance - np.linalg.multi_dot(
-            (kalman_gain, projected_cov, kalman_gain.T)
+        # Share the vectorized correction so both paths stay in sync.
+        new_mean, new_covariance = self.multi_update(
+            np.asarray(mean)[None], np.asarray(covariance)[None],
+            np.asarray(measurement)[None],
         )
-        return new_mean, new_covariance
+        return new_mean[0], new_covariance[0]
@@ -1,39 +1,49 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Tuple
+from typing import List, Optional, Tuple
 
 import numpy as np
 from scipy.optimize import linear_sum_assignment
 
+from sbytetrack.single_object_track import STrack
 from sbytetrack.utils import box_iou_batch
 
 
-if TYPE_CHECKING:
-    from supervision.tracker.byte_tracker.core import STrack
-
-
 def indices_to_matches(
     cost_matrix: np.ndarray, indices: np.ndarray, thresh: float
 ) -> Tuple[np.ndarray, tuple, tuple]:
-    matched_cost = cost_matrix[tuple(zip(*indices))]
+    matched_cost = cost_matrix[indices[:, 0], indices[:, 1]]
     matched_mask = matched_cost <= thresh
 
     matches = indices[matched_mask]
-    unmatched_a = tuple(set(range(cost_matrix.shape[0])) - set(matches[:, 0]))
-    unmatched_b = tuple(set(range(cost_matrix.shape[1])) - set(matches[:, 1]))
+    unmatched_a_mask = np.ones(cost_matrix.shape[0], dtype=bool)
+    unmatched_a_mask[matches[:, 0]] = False
+    unmatched_b_mask = np.ones(cost_matrix.shape[1], dtype=bool)
+    unmatched_b_mask[matches[:, 1]] = False
+
+    unmatched_a = tuple(np.flatnonzero(unmatched_a_mask).tolist())
+    unmatched_b = tuple(np.flatnonzero(unmatched_b_mask).tolist())
     return matches, unmatched_a, unmatched_b
 
 
+def empty_assignment(
+    n_a: int, n_b: int
+) -> Tuple[np.ndarray, Tuple[int], Tuple[int, int]]:
+    return (
+        np.empty((0, 2), dtype=int),
+        tuple(range(n_a)),
+        tuple(range(n_b)),
+    )
+
+
 def linear_assignment(
     cost_matrix: np.ndarray, thresh: float
 ) -> Tuple[np.ndarray, Tuple[int], Tuple[int, int]]:
     if cost_matrix.size == 0:
-        return (
-            np.empty((0, 2), dtype=int),
-            tuple(range(cost_matrix.shape[0])),
-            tuple(range(cost_matrix.shape[1])),
-        )
+        return empty_assignment(*cost_matrix.shape)
 
+    # Clamp instead of masking to inf so scipy's LAPJV solver never sees an
+    # infeasible matrix; clamped pairs are rejected by indices_to_matches.
     cost_matrix[cost_matrix > thresh] = thresh + 1e-4
     row_ind, col_ind = linear_sum_assignment(cost_matrix)
     indices = np.column_stack((row_ind, col_ind))
@@ -41,30 +51,42 @@ def linear_assignment(
     return indices_to_matches(cost_matrix, indices, thresh)
 
 
-def iou_distance(atracks: List[STrack], btracks: List[STrack]) -> np.ndarray:
+def iou_distance(
+    atracks: List[STrack], btracks: List[STrack], out: Optional[np.ndarray] = None
+) -> np.ndarray:
     if (len(atracks) > 0 and isinstance(atracks[0], np.ndarray)) or (
         len(btracks) > 0 and isinstance(btracks[0], np.ndarray)
     ):
         atlbrs = atracks
         btlbrs = btracks
     else:
-        atlbrs = [track.tlbr for track in atracks]
-        btlbrs = [track.tlbr for track in btracks]
+        atlbrs = STrack.stack_tlbr(atracks)
+        btlbrs = STrack.stack_tlbr(btracks)
 
-    _ious = np.zeros((len(atlbrs), len(btlbrs)), dtype=np.float32)
-    if _ious.size != 0:
-        _ious = box_iou_batch(np.asarray(atlbrs), np.asarray(btlbrs))
-    cost_matrix = 1 - _ious
+    if out is None:
+        out = np.empty((len(atlbrs), len(btlbrs)), dtype=np.float32)
+    if out.size == 0:
+        return out
+
+    _ious = box_iou_batch(np.asarray(atlbrs), np.asarray(btlbrs), out=out)
+    cost_matrix = np.subtract(1, _ious, out=_ious)
 
     return cost_matrix
 
 
 def fuse_score(cost_matrix: np.ndarray, stracks: List[STrack]) -> np.ndarray:
+    """Fuse detection scores into an IoU cost matrix. Modifies `cost_matrix`
+    in place and returns it.
+    """
     if cost_matrix.size == 0:
         return cost_matrix
-    iou_sim = 1 - cost_matrix
-    det_scores = np.array([strack.score for strack in stracks])
-    det_scores = np.expand_dims(det_scores, axis=0).repeat(cost_matrix.shape[0], axis=0)
-    fuse_sim = iou_sim * det_scores
-    fuse_cost = 1 - fuse_sim
-    return fuse_cost
+    det_scores = np.fromiter(
+        (strack.score for strack in stracks),
+        dtype=cost_matrix.dtype,
+        count=len(stracks),
+    )
+    # 1 - (1 - cost) * score == cost * score + (1 - score), computed in place
+    # in two passes over the matrix without an (N, M) score array.
+    cost_matrix *= det_scores
+    cost_matrix += 1 - det_scores
+    return cost_matrix
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import List
+from typing import List, Tuple
 
 import numpy as np
 import numpy.typing as npt
@@ -18,6 +18,26 @@ class TrackState(Enum):
 
 
 class STrack:
+    __slots__ = (
+        "state",
+        "is_activated",
+        "start_frame",
+        "frame_id",
+        "_tlwh",
+        "kalman_filter",
+        "shared_kalman",
+        "mean",
+        "covariance",
+        "_tlbr_cache",
+        "score",
+        "tracklet_len",
+        "minimum_consecutive_frames",
+        "internal_id_counter",
+        "external_id_counter",
+        "internal_track_id",
+        "external_track_id",
+    )
+
     def __init__(
         self,
         tlwh: npt.NDArray[np.float32],
@@ -27,16 +47,37 @@ class STrack:
         internal_id_counter: IdCounter,
         external_id_counter: IdCounter,
     ):
+        self._init_state(
+            np.asarray(tlwh, dtype=np.float32),
+            score,
+            minimum_consecutive_frames,
+            shared_kalman,
+            internal_id_counter,
+            external_id_counter,
+        )
+
+    def _init_state(
+        self,
+        tlwh: npt.NDArray[np.float32],
+        score: npt.NDArray[np.float32],
+        minimum_consecutive_frames: int,
+        shared_kalman: KalmanFilter,
+        internal_id_counter: IdCounter,
+        external_id_counter: IdCounter,
+    ) -> None:
+        """Assign every slot of a new track; shared by `__init__` and
+        `create_batch`. `tlwh` must already be a float32 array.
+        """
         self.state = TrackState.New
         self.is_activated = False
         self.start_frame = 0
         self.frame_id = 0
 
-        self._tlwh = np.asarray(tlwh, dtype=np.float32)
+        self._tlwh = tlwh
         self.kalman_filter = None
         self.shared_kalman = shared_kalman
         self.mean, self.covariance = None, None
-        self.is_activated = False
+        self._tlbr_cache = None
 
         self.score = score
         self.tracklet_len = 0
@@ -48,6 +89,36 @@ class STrack:
         self.internal_track_id = self.internal_id_counter.NO_ID
         self.external_track_id = self.external_id_counter.NO_ID
 
+    @classmethod
+    def create_batch(
+        cls,
+        tlwhs: npt.NDArray[np.float32],
+        scores: npt.NDArray[np.float32],
+        minimum_consecutive_frames: int,
+        shared_kalman: KalmanFilter,
+        internal_id_counter: IdCounter,
+        external_id_counter: IdCounter,
+    ) -> List[STrack]:
+        """Create one new track per row of `tlwhs`, equivalent to calling
+        `STrack(tlwhs[i], scores[i], ...)` for each row but converting the
+        boxes once and skipping `__init__`.
+        """
+        tlwhs = np.asarray(tlwhs, dtype=np.float32)
+
+        stracks = [None] * len(tlwhs)
+        for i in range(len(tlwhs)):
+            st = object.__new__(cls)
+            st._init_state(
+                tlwhs[i],
+                scores[i],
+                minimum_consecutive_frames,
+                shared_kalman,
+                internal_id_counter,
+                external_id_counter,
+            )
+            stracks[i] = st
+        return stracks
+
     def predict(self) -> None:
         mean_state = self.mean.copy()
         if self.state != TrackState.Tracked:
@@ -55,24 +126,66 @@ class STrack:
         self.mean, self.covariance = self.kalman_filter.predict(
             mean_state, self.covariance
         )
+        self._tlbr_cache = None
 
     @staticmethod
     def multi_predict(stracks: List[STrack], shared_kalman: KalmanFilter) -> None:
         if len(stracks) > 0:
-            multi_mean = []
-            multi_covariance = []
-            for i, st in enumerate(stracks):
-                multi_mean.append(st.mean.copy())
-                multi_covariance.append(st.covariance)
-                if st.state != TrackState.Tracked:
-                    multi_mean[i][7] = 0
+            # Gather the track states into (N, 8) and (N, 8, 8) arrays so the
+            # prediction runs as one batched operation.
+            multi_mean = np.stack([st.mean for st in stracks])
+            multi_covariance = np.stack([st.covariance for st in stracks])
+            not_tracked = np.fromiter(
+                (st.state != TrackState.Tracked for st in stracks),
+                dtype=bool,
+                count=len(stracks),
+            )
+            multi_mean[not_tracked, 7] = 0
 
             multi_mean, multi_covariance = shared_kalman.multi_predict(
-                np.asarray(multi_mean), np.asarray(multi_covariance)
+                multi_mean, multi_covariance
             )
-            for i, (mean, cov) in enumerate(zip(multi_mean, multi_covariance)):
-                stracks[i].mean = mean
-                stracks[i].covariance = cov
+            for i, st in enumerate(stracks):
+                st.mean = multi_mean[i]
+                st.covariance = multi_covariance[i]
+                st._tlbr_cache = None
+
+    @staticmethod
+    def multi_update(
+        stracks: List[STrack],
+        new_tracks: List[STrack],
+        frame_id: int,
+        shared_kalman: KalmanFilter,
+    ) -> Tuple[List[STrack], List[STrack]]:
+        """Batched `update` / `re_activate` of `stracks` with their matched
+        `new_tracks`. Tracked tracks are updated, the others re-activated.
+
+        Returns:
+            Tuple[List[STrack], List[STrack]]: The updated and the
+                re-activated tracks, in input order.
+        """
+        updated, re_activated = [], []
+        if len(stracks) > 0:
+            multi_mean = np.stack([st.mean for st in stracks])
+            multi_covariance = np.stack([st.covariance for st in stracks])
+            multi_measurement = np.stack(
+                [STrack.tlwh_to_xyah(nt.tlwh) for nt in new_tracks]
+            )
+
+            multi_mean, multi_covariance = shared_kalman.multi_update(
+                multi_mean, multi_covariance, multi_measurement
+            )
+            for i, (st, nt) in enumerate(zip(stracks, new_tracks)):
+                st.mean = multi_mean[i]
+                st.covariance = multi_covariance[i]
+                st._tlbr_cache = None
+                if st.state == TrackState.Tracked:
+                    st._mark_updated(nt, frame_id)
+                    updated.append(st)
+                else:
+                    st._mark_re_activated(nt, frame_id)
+                    re_activated.append(st)
+        return updated, re_activated
 
     def activate(self, kalman_filter: KalmanFilter, frame_id: int) -> None:
         """Start a new tracklet"""
@@ -81,6 +194,7 @@ class STrack:
         self.mean, self.covariance = self.kalman_filter.initiate(
             self.tlwh_to_xyah(self._tlwh)
         )
+        self._tlbr_cache = None
 
         self.tracklet_len = 0
         self.state = TrackState.Tracked
@@ -97,6 +211,10 @@ class STrack:
         self.mean, self.covariance = self.kalman_filter.update(
             self.mean, self.covariance, self.tlwh_to_xyah(new_track.tlwh)
         )
+        self._tlbr_cache = None
+        self._mark_re_activated(new_track, frame_id)
+
+    def _mark_re_activated(self, new_track: STrack, frame_id: int) -> None:
         self.tracklet_len = 0
         self.state = TrackState.Tracked
 
@@ -111,13 +229,16 @@ class STrack:
         :type update_feature: bool
         :return:
         """
-        self.frame_id = frame_id
-        self.tracklet_len += 1
-
         new_tlwh = new_track.tlwh
         self.mean, self.covariance = self.kalman_filter.update(
             self.mean, self.covariance, self.tlwh_to_xyah(new_tlwh)
         )
+        self._tlbr_cache = None
+        self._mark_updated(new_track, frame_id)
+
+    def _mark_updated(self, new_track: STrack, frame_id: int) -> None:
+        self.frame_id = frame_id
+        self.tracklet_len += 1
         self.state = TrackState.Tracked
         if self.tracklet_len == self.minimum_consecutive_frames:
             self.is_activated = True
@@ -143,9 +264,25 @@ class STrack:
         """Convert bounding box to format `(min x, min y, max x, max y)`, i.e.,
         `(top left, bottom right)`.
         """
-        ret = self.tlwh.copy()
+        ret = self.tlwh
         ret[2:] += ret[:2]
-        return ret
+        return ret.astype(np.float32, copy=False)
+
+    def tlbr_cached(self) -> npt.NDArray[np.float32]:
+        """Same as `tlbr`, but memoized until the track state changes. The
+        returned array is shared and must not be modified.
+        """
+        if self._tlbr_cache is None:
+            self._tlbr_cache = self.tlbr
+        return self._tlbr_cache
+
+    @staticmethod
+    def stack_tlbr(stracks: List[STrack]) -> npt.NDArray[np.float32]:
+        """Stack the `tlbr` boxes of `stracks` into a `(N, 4)` array."""
+        out = np.empty((len(stracks), 4), dtype=np.float32)
+        for i, st in enumerate(stracks):
+            out[i, :] = st.tlbr_cached()
+        return out
 
     @staticmethod
     def tlwh_to_xyah(tlwh) -> npt.NDArray[np.float32]:
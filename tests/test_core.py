@@ -0,0 +1,131 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from sbytetrack import BYTETrack, core, utils
+from sbytetrack.single_object_track import STrack
+from sbytetrack.utils import IdCounter
+
+
+@pytest.fixture(params=["numpy", "numba"])
+def iou_backend(request, monkeypatch):
+    if request.param == "numpy":
+        monkeypatch.setattr(utils, "_iou_kernel", None)
+    elif utils._iou_kernel is None:
+        pytest.skip("numba is not installed")
+    return request.param
+
+
+def test_update_keeps_original_detection_order():
+    tracker = BYTETrack(n_classes=3)
+    xyxy = np.array([[200, 200, 250, 250], [100, 100, 150, 150], [10, 10, 60, 60]])
+    conf = np.array([0.9, 0.8, 0.9])
+    cls = np.array([2, 0, 2])
+
+    first = tracker.update(xyxy, conf, cls)
+    second = tracker.update(xyxy + 1, conf, cls)
+
+    assert len(set(first.tolist())) == 3
+    np.testing.assert_array_equal(first, second)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_zero_height_detection_does_not_break_tracking(iou_backend):
+    tracker = BYTETrack(n_classes=1)
+    xyxy = np.array([[10, 10, 40, 10], [100, 100, 150, 150], [300, 300, 340, 360]])
+    conf = np.array([0.9, 0.9, 0.9])
+    cls = np.array([0, 0, 0])
+
+    for _ in range(5):
+        track_ids = tracker.update(xyxy, conf, cls)
+        assert track_ids[0] == -1
+        assert (track_ids[1:] > 0).all()
+
+
+@pytest.mark.parametrize(
+    "track_activation_threshold, score",
+    [(0.3, 0.3), (0.25, 0.1)],
+)
+def test_float32_scores_at_a_threshold_are_not_matched(
+    track_activation_threshold, score
+):
+    # A float32 score equal to a threshold is neither above the activation
+    # threshold nor above the 0.1 low-score cut when compared in float32.
+    tracker = BYTETrack(
+        n_classes=1, track_activation_threshold=track_activation_threshold
+    )
+    xyxy = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    cls = np.array([0])
+
+    for _ in range(2):
+        assert tracker.update(xyxy, np.array([0.9], dtype=np.float32), cls)[0] > 0
+    track_ids = tracker.update(xyxy, np.array([score], dtype=np.float32), cls)
+
+    np.testing.assert_array_equal(track_ids, [-1])
+
+
+@pytest.mark.parametrize("cls_id", [-1, 3, 0.5, 1.5, float("nan"), float("inf")])
+def test_update_rejects_invalid_class_ids(cls_id):
+    tracker = BYTETrack(n_classes=3)
+    with pytest.raises(ValueError):
+        tracker.update([[0, 0, 10, 10], [20, 20, 30, 30]], [0.9, 0.9], [0, cls_id])
+
+
+def test_create_batch_matches_constructor():
+    internal_id_counter, external_id_counter = IdCounter(), IdCounter(start_id=1)
+    tlwhs = np.array([[10, 20, 30, 40], [50, 60, 70, 80]], dtype=np.float32)
+    scores = np.array([0.9, 0.4])
+
+    batch = STrack.create_batch(
+        tlwhs, scores, 1, None, internal_id_counter, external_id_counter
+    )
+    for tlwh, score, track in zip(tlwhs, scores, batch):
+        expected = STrack(tlwh, score, 1, None, internal_id_counter, external_id_counter)
+        for name in STrack.__slots__:
+            np.testing.assert_equal(getattr(track, name), getattr(expected, name))
+
+
+def moving_boxes(n_classes, n_objects, n_frames, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0, 800, (n_objects, 2))
+    velocity = rng.normal(0, 3, (n_objects, 2))
+    size = rng.uniform(20, 80, (n_objects, 2))
+    cls = rng.integers(0, n_classes, n_objects)
+    for frame in range(n_frames):
+        keep = rng.random(n_objects) > 0.15
+        position = base + velocity * frame + rng.normal(0, 1, (n_objects, 2))
+        xyxy = np.hstack([position, position + size])[keep]
+        yield xyxy, rng.uniform(0.05, 1.0, n_objects)[keep], cls[keep]
+
+
+def test_parallel_requires_independent_classes():
+    with pytest.raises(ValueError):
+        BYTETrack(n_classes=3, parallel=True)
+
+
+def test_parallel_matches_sequential_independent_classes(monkeypatch):
+    monkeypatch.setattr(core.os, "cpu_count", lambda: 4)
+    sequential = BYTETrack(n_classes=8, independent_classes=True)
+    parallel = BYTETrack(n_classes=8, independent_classes=True, parallel=True)
+
+    # Track IDs may be handed out in a different order across classes, so
+    # compare the associations up to a consistent relabeling.
+    relabel = {}
+    for xyxy, conf, cls in moving_boxes(n_classes=8, n_objects=40, n_frames=30):
+        expected = sequential.update(xyxy, conf, cls)
+        track_ids = parallel.update(xyxy, conf, cls)
+        np.testing.assert_array_equal(track_ids == -1, expected == -1)
+        for expected_id, track_id in zip(expected, track_ids):
+            if expected_id != -1:
+                assert relabel.setdefault(expected_id, track_id) == track_id
+
+    assert parallel._executor is not None
+    restored = pickle.loads(pickle.dumps(parallel))
+    assert restored._executor is None
+
+    executor = parallel._executor
+    parallel.reset()
+    assert parallel._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
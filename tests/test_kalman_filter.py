@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+import scipy.linalg
+
+from sbytetrack import kalman_filter
+from sbytetrack.kalman_filter import KalmanFilter
+
+
+@pytest.fixture(params=["numpy", "numba"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        monkeypatch.setattr(kalman_filter, "_multi_predict_kernel", None)
+        monkeypatch.setattr(kalman_filter, "_multi_update_kernel", None)
+    elif kalman_filter._multi_predict_kernel is None:
+        pytest.skip("numba is not installed")
+    return request.param
+
+
+def reference_update(kf, mean, covariance, measurement):
+    """The original Cholesky-based correction step."""
+    projected_mean, projected_cov = kf.project(mean, covariance)
+    chol_factor, lower = scipy.linalg.cho_factor(projected_cov, lower=True)
+    kalman_gain = scipy.linalg.cho_solve(
+        (chol_factor, lower), np.dot(covariance, kf._update_mat.T).T
+    ).T
+    innovation = measurement - projected_mean
+    new_mean = mean + np.dot(innovation, kalman_gain.T)
+    new_covariance = covariance - np.linalg.multi_dot(
+        (kalman_gain, projected_cov, kalman_gain.T)
+    )
+    return new_mean, new_covariance
+
+
+def predicted_states(kf, rng, n):
+    means, covariances = [], []
+    for _ in range(n):
+        measurement = np.array([50, 60, 0.5, 80]) + rng.normal(0, 5, 4)
+        mean, covariance = kf.initiate(measurement)
+        mean, covariance = kf.predict(mean, covariance)
+        means.append(mean)
+        covariances.append(covariance)
+    return np.stack(means), np.stack(covariances)
+
+
+def test_update_and_multi_update_match_reference(backend):
+    kf = KalmanFilter()
+    rng = np.random.default_rng(0)
+    means, covariances = predicted_states(kf, rng, 5)
+    measurements = means[:, :4] + rng.normal(0, 2, (5, 4))
+
+    multi_means, multi_covariances = kf.multi_update(means, covariances, measurements)
+    for i in range(5):
+        expected = reference_update(kf, means[i], covariances[i], measurements[i])
+        mean, covariance = kf.update(means[i], covariances[i], measurements[i])
+
+        np.testing.assert_allclose(mean, expected[0])
+        np.testing.assert_allclose(covariance, expected[1], atol=1e-12)
+        np.testing.assert_allclose(multi_means[i], expected[0])
+        np.testing.assert_allclose(multi_covariances[i], expected[1], atol=1e-12)
+
+
+def test_predict_and_multi_predict_match_reference(backend):
+    kf = KalmanFilter()
+    means, covariances = predicted_states(kf, np.random.default_rng(1), 4)
+
+    multi_means, multi_covariances = kf.multi_predict(means, covariances)
+    for i in range(4):
+        std = kf._std_weight_position * means[i, 3]
+        std_vel = kf._std_weight_velocity * means[i, 3]
+        motion_cov = np.diag(
+            np.square([std, std, 1e-2, std, std_vel, std_vel, 1e-5, std_vel])
+        )
+        expected_mean = np.dot(means[i], kf._motion_mat.T)
+        expected_covariance = (
+            np.linalg.multi_dot((kf._motion_mat, covariances[i], kf._motion_mat.T))
+            + motion_cov
+        )
+        mean, covariance = kf.predict(means[i], covariances[i])
+
+        np.testing.assert_allclose(mean, expected_mean)
+        np.testing.assert_allclose(covariance, expected_covariance)
+        np.testing.assert_allclose(multi_means[i], expected_mean)
+        np.testing.assert_allclose(multi_covariances[i], expected_covariance)
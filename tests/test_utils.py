@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from sbytetrack import utils
+from sbytetrack.utils import box_iou, box_iou_batch
+
+NAN = float("nan")
+INF = float("inf")
+
+
+@pytest.mark.parametrize(
+    "box_true, box_detection, expected",
+    [
+        ([0, 0, 10, 10], [0, 0, 10, 10], 1.0),
+        ([0, 0, 10, 10], [5, 5, 15, 15], 25 / 175),
+        ([0, 0, 10, 10], [20, 20, 30, 30], 0.0),
+        ([10, 10, 40, 10], [10, 10, 40, 10], 0.0),
+        ([NAN, NAN, NAN, NAN], [0, 0, 10, 10], 0.0),
+        ([0, 0, 10, 10], [0, 0, 10, NAN], 0.0),
+        ([0, 0, INF, INF], [0, 0, INF, INF], 0.0),
+    ],
+)
+def test_box_iou(box_true, box_detection, expected):
+    iou = box_iou(np.array(box_true, dtype=float), np.array(box_detection, dtype=float))
+    assert iou == pytest.approx(expected)
+
+
+def reference_box_iou_batch(boxes_true, boxes_detection):
+    """The original broadcasting implementation of `box_iou_batch`."""
+
+    def box_area(box):
+        return (box[2] - box[0]) * (box[3] - box[1])
+
+    area_true = box_area(boxes_true.T)
+    area_detection = box_area(boxes_detection.T)
+
+    top_left = np.maximum(boxes_true[:, None, :2], boxes_detection[:, :2])
+    bottom_right = np.minimum(boxes_true[:, None, 2:], boxes_detection[:, 2:])
+
+    area_inter = np.prod(np.clip(bottom_right - top_left, a_min=0, a_max=None), 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ious = area_inter / (area_true[:, None] + area_detection - area_inter)
+    return np.nan_to_num(ious)
+
+
+def scalar_box_iou_batch(boxes_true, boxes_detection):
+    return np.array(
+        [[box_iou(a, b) for b in boxes_detection] for a in boxes_true],
+        dtype=np.float32,
+    ).reshape(len(boxes_true), len(boxes_detection))
+
+
+def numpy_box_iou_batch(boxes_true, boxes_detection):
+    kernel = utils._iou_kernel
+    utils._iou_kernel = None
+    try:
+        with np.errstate(invalid="ignore", over="ignore"):
+            return box_iou_batch(boxes_true, boxes_detection)
+    finally:
+        utils._iou_kernel = kernel
+
+
+def numba_box_iou_batch(boxes_true, boxes_detection):
+    if utils._iou_kernel is None:
+        pytest.skip("numba is not installed")
+    return box_iou_batch(boxes_true, boxes_detection)
+
+
+def numba_serial_box_iou_batch(boxes_true, boxes_detection):
+    if utils._iou_kernel is None:
+        pytest.skip("numba is not installed")
+    utils.use_serial_kernels()
+    try:
+        return box_iou_batch(boxes_true, boxes_detection)
+    finally:
+        utils._thread_state.serial = False
+
+
+IOU_PATHS = [
+    scalar_box_iou_batch,
+    numpy_box_iou_batch,
+    numba_box_iou_batch,
+    numba_serial_box_iou_batch,
+]
+
+
+def random_boxes(rng, n, max_size=80.0):
+    boxes = rng.uniform(0, 300, (n, 4))
+    boxes[:, 2:] = boxes[:, :2] + rng.uniform(1, max_size, (n, 2))
+    return boxes.astype(np.float32)
+
+
+def degenerate_boxes():
+    return np.array(
+        [
+            [10, 10, 40, 10],  # zero height
+            [10, 10, 10, 40],  # zero width
+            [40, 40, 10, 10],  # inverted corners
+            [NAN, NAN, NAN, NAN],
+            [10, 10, 40, NAN],
+            [0, 0, INF, INF],
+            [-INF, -INF, INF, INF],
+            [5, 5, 35, 35],
+        ],
+        dtype=np.float32,
+    )
+
+
+@pytest.mark.parametrize("iou_path", IOU_PATHS)
+@pytest.mark.parametrize("shape", [(1, 1), (2, 2), (1, 7), (13, 9), (40, 60)])
+def test_box_iou_batch_paths_match_reference(iou_path, shape):
+    rng = np.random.default_rng(sum(shape))
+    boxes_true = random_boxes(rng, shape[0])
+    boxes_detection = random_boxes(rng, shape[1])
+    boxes_detection[0] = boxes_true[0]
+
+    expected = reference_box_iou_batch(boxes_true, boxes_detection)
+    ious = iou_path(boxes_true, boxes_detection)
+
+    assert ious.shape == shape
+    np.testing.assert_allclose(ious, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("iou_path", IOU_PATHS)
+def test_box_iou_batch_paths_agree_on_degenerate_boxes(iou_path):
+    rng = np.random.default_rng(0)
+    boxes = np.concatenate([degenerate_boxes(), random_boxes(rng, 4, 40.0)])
+
+    ious = iou_path(boxes, boxes)
+
+    assert np.isfinite(ious).all()
+    np.testing.assert_allclose(ious, scalar_box_iou_batch(boxes, boxes), atol=1e-6)
+
+
+@pytest.mark.parametrize("iou_path", IOU_PATHS)
+def test_box_iou_batch_empty(iou_path):
+    boxes = random_boxes(np.random.default_rng(0), 3)
+    assert iou_path(boxes[:0], boxes).shape == (0, 3)
+    assert iou_path(boxes, boxes[:0]).shape == (3, 0)